@@ -7,11 +7,16 @@ compatible with macOS Calendar, or exports directly to Google Calendar.
 
 import argparse
 import email
+import functools
+import hashlib
+import json
 import os
-import pickle
 import re
 import sys
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
 from email import policy
 from email.parser import BytesParser
 from html.parser import HTMLParser
@@ -24,17 +29,111 @@ try:
 except ImportError:
     pass  # dotenv not installed, continue without it
 
+# Fast C-based HTML parser (optional, falls back to html.parser)
+try:
+    from selectolax.lexbor import LexborHTMLParser as FastHTMLParser
+    FAST_HTML_PARSER_AVAILABLE = True
+except ImportError:
+    FAST_HTML_PARSER_AVAILABLE = False
+
+# Progress bar for Google Calendar export (optional, falls back to printed progress)
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
 # Google Calendar API imports (optional)
 try:
+    import google_auth_httplib2
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
     from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
+    from googleapiclient.http import build_http
     GOOGLE_CALENDAR_AVAILABLE = True
 except ImportError:
     GOOGLE_CALENDAR_AVAILABLE = False
 
+# Values accepted as "true" for boolean environment settings
+_TRUTHY = frozenset({'true', '1', 'yes', 'on', 'y'})
+
+# Command-line defaults, read once from the environment (or .env file)
+_DEFAULT_INPUT_FILE = os.getenv('OUTLOOK_INPUT_FILE', 'calendar.mhtml')
+_DEFAULT_OUTPUT_FILE = os.getenv('OUTLOOK_OUTPUT_FILE', 'outlook_calendar.ics')
+_DEFAULT_EMAIL_DOMAIN = os.getenv('OUTLOOK_EMAIL_DOMAIN', 'domain.com')
+_DEFAULT_TIMEZONE = os.getenv('OUTLOOK_TIMEZONE', 'America/Los_Angeles')
+_DEFAULT_CALENDAR_NAME = os.getenv('GOOGLE_CALENDAR_NAME')
+_DEFAULT_CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
+_DEFAULT_USE_SERVICE_ACCOUNT = os.getenv('GOOGLE_USE_SERVICE_ACCOUNT', '').strip().lower() in _TRUTHY
+_DEFAULT_CALENDAR_ID = os.getenv('GOOGLE_CALENDAR_ID')
+
+# Screening pattern for event aria-labels: a " to " time range plus a weekday name
+# (in either order), checked in a single pass instead of repeated substring scans
+_EVENT_LABEL_RE = re.compile(
+    r'(?:Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day.* to '
+    r'| to .*(?:Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day',
+    re.DOTALL
+)
+
+# Time range inside an event aria-label (e.g. "10:30 to 11:00")
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2}) to (\d{1,2}):(\d{2})')
+
+# Free/busy status values that can appear in an event aria-label
+_STATUS_WORDS = frozenset({"Tentative", "Busy", "Free", "Out of Office"})
+
+# Header markers that identify an MHTML file by its first line
+_MHTML_MARKERS = ('From:', 'MIME-Version:', 'Content-Type: multipart')
+
+# Outlook free/busy status -> ICS STATUS value
+_ICS_STATUS_MAP = {
+    "Tentative": "TENTATIVE",
+    "Busy": "CONFIRMED",
+    "Free": "CONFIRMED",
+    "Out of Office": "CONFIRMED"
+}
+
+# Outlook free/busy status -> Google Calendar event status
+_GCAL_STATUS_MAP = {
+    'Tentative': 'tentative',
+    'Busy': 'confirmed',
+    'Free': 'confirmed',
+    'Out of Office': 'confirmed'
+}
+
+# Translation table for escaping ICS text values (RFC 5545)
+_ICS_ESCAPE = str.maketrans({"\\": "\\\\", ";": "\\;", ",": "\\,", "\n": "\\n"})
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_calendar_date(date_str):
+    """Parse an aria-label date such as "September 29, 2025".
+    
+    Calendar exports repeat the same few hundred dates across many events,
+    so parsed results are cached by string.
+    """
+    return datetime.strptime(date_str, "%B %d, %Y")
+
+
+def _ics_fmt(dt):
+    """Format a datetime as an ICS date-time (YYYYMMDDTHHMMSS)."""
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}T{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
+
+
+def _decode_text_part(part):
+    """Decode the body of a text MIME part to a string.
+    
+    Falls back to UTF-8 (the encoding used for plain HTML input) when the
+    part declares no charset or an unknown one.
+    """
+    payload = part.get_payload(decode=True) or b''
+    charset = part.get_content_charset() or 'utf-8'
+    try:
+        return payload.decode(charset, errors='replace')
+    except LookupError:
+        return payload.decode('utf-8', errors='replace')
+
 
 def extract_html_from_mhtml(file_path):
     """Extract HTML content from MHTML file.
@@ -55,24 +154,20 @@ def extract_html_from_mhtml(file_path):
             f.seek(0)
             
             # Check for MHTML markers (MIME headers)
-            if not any(marker in first_line for marker in ['From:', 'MIME-Version:', 'Content-Type: multipart']):
+            if not any(marker in first_line for marker in _MHTML_MARKERS):
                 # Not an MHTML file, return None
                 return None
             
-            # Parse as MIME message
-            msg = BytesParser(policy=policy.default).parse(f)
+            # Parse as MIME message. compat32 keeps plain Message objects without
+            # structured header parsing; only the HTML part's body is ever decoded.
+            msg = BytesParser(policy=policy.compat32).parse(f)
             
-            # Walk through all parts to find HTML content
-            if msg.is_multipart():
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    if content_type == 'text/html':
-                        # Found HTML part
-                        return part.get_content()
-            else:
-                # Single part message
-                if msg.get_content_type() == 'text/html':
-                    return msg.get_content()
+            # Walk through all parts to find HTML content (msg.walk() also
+            # yields msg itself, which covers single part messages)
+            for part in msg.walk():
+                if part.get_content_type() == 'text/html':
+                    # Found HTML part
+                    return _decode_text_part(part)
             
             return None
             
@@ -90,20 +185,26 @@ class OutlookEventParser(HTMLParser):
         
     def handle_starttag(self, tag, attrs):
         """Extract event data from div tags with aria-label attributes."""
-        if tag == "div":
-            attrs_dict = dict(attrs)
-            aria_label = attrs_dict.get("aria-label", "")
-            
-            # Look for calendar event patterns in aria-label
-            if " to " in aria_label and ("Monday" in aria_label or "Tuesday" in aria_label or 
-                "Wednesday" in aria_label or "Thursday" in aria_label or 
-                "Friday" in aria_label or "Saturday" in aria_label or "Sunday" in aria_label):
-                
-                event_data = self.parse_event_label(aria_label)
-                if event_data:
-                    self.events.append(event_data)
+        if tag != "div":
+            return
+        
+        # Scan the attribute list directly rather than building a dict per div
+        aria_label = None
+        for name, value in attrs:
+            if name == "aria-label":
+                aria_label = value
+                break
+        
+        # Look for calendar event patterns in aria-label
+        if not aria_label or not _EVENT_LABEL_RE.search(aria_label):
+            return
+        
+        event_data = self.parse_event_label(aria_label)
+        if event_data:
+            self.events.append(event_data)
     
-    def parse_event_label(self, label):
+    @staticmethod
+    def parse_event_label(label):
         """Parse event information from aria-label text."""
         try:
             # Pattern: "Event Name, HH:MM to HH:MM, Day, Month DD, YYYY, By Organizer, Status, Type"
@@ -114,17 +215,33 @@ class OutlookEventParser(HTMLParser):
             if len(parts) < 5:
                 return None
             
-            # Find the time pattern (HH:MM to HH:MM)
-            time_pattern = re.compile(r'(\d{1,2}):(\d{2}) to (\d{1,2}):(\d{2})')
+            # Single pass over the parts: find the time range (HH:MM to HH:MM),
+            # then pick organizer, status and type out of the parts after the date
             time_idx = None
             time_match = None
+            organizer = None
+            status = ""
+            event_type = ""
             
             for i, part in enumerate(parts):
-                match = time_pattern.search(part)
-                if match:
-                    time_idx = i
-                    time_match = match
-                    break
+                if time_idx is None:
+                    match = _TIME_RE.search(part)
+                    if match:
+                        time_idx = i
+                        time_match = match
+                    continue
+                
+                # Day, month/day and year follow the time
+                if i <= time_idx + 3:
+                    continue
+                
+                # Organizer comes after "By "
+                if organizer is None and part.startswith("By "):
+                    organizer = part[3:].strip()
+                if part in _STATUS_WORDS:
+                    status = part
+                if "Recurring" in part or "Exception" in part or "Canceled" in part:
+                    event_type = part
             
             if not time_idx or not time_match:
                 return None
@@ -146,27 +263,14 @@ class OutlookEventParser(HTMLParser):
             
             # Parse the date
             date_str = f"{month_day}, {year}"
-            date_obj = datetime.strptime(date_str, "%B %d, %Y")
+            date_obj = _parse_calendar_date(date_str)
             
             # Combine date with times
             start_time = date_obj.replace(hour=int(start_hour), minute=int(start_min))
             end_time = date_obj.replace(hour=int(end_hour), minute=int(end_min))
             
-            # Extract organizer (comes after "By ")
-            organizer = ""
-            for part in parts[time_idx + 4:]:
-                if part.startswith("By "):
-                    organizer = part[3:].strip()
-                    break
-            
-            # Extract status and type
-            status = ""
-            event_type = ""
-            for i in range(time_idx + 4, len(parts)):
-                if parts[i] in ["Tentative", "Busy", "Free", "Out of Office"]:
-                    status = parts[i]
-                if "Recurring" in parts[i] or "Exception" in parts[i] or "Canceled" in parts[i]:
-                    event_type = parts[i]
+            if organizer is None:
+                organizer = ""
             
             # Check if event is canceled
             is_canceled = "Canceled:" in event_name or "Canceled" in event_type
@@ -186,6 +290,106 @@ class OutlookEventParser(HTMLParser):
             return None
 
 
+def parse_events(html_content):
+    """Extract calendar events from Outlook HTML content.
+    
+    Uses selectolax when installed (C-based, much faster on large exports),
+    otherwise the pure-Python OutlookEventParser.
+    
+    Args:
+        html_content: HTML content as string
+        
+    Returns:
+        List of event dictionaries
+    """
+    if not FAST_HTML_PARSER_AVAILABLE:
+        parser = OutlookEventParser()
+        parser.feed(html_content)
+        parser.close()
+        return parser.events
+    
+    events = []
+    tree = FastHTMLParser(html_content)
+    for node in tree.css('div[aria-label]'):
+        aria_label = node.attributes.get('aria-label')
+        if not aria_label or not _EVENT_LABEL_RE.search(aria_label):
+            continue
+        event_data = OutlookEventParser.parse_event_label(aria_label)
+        if event_data:
+            events.append(event_data)
+    return events
+
+
+def parse_html_file(file_path, chunk_size=65536):
+    """Extract calendar events from a plain HTML file.
+    
+    With the pure-Python parser the file is fed in chunks, so the whole
+    document is never held in memory as a single string.
+    
+    Args:
+        file_path: Path to the HTML file
+        chunk_size: Number of characters to read per chunk
+        
+    Returns:
+        List of event dictionaries
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if FAST_HTML_PARSER_AVAILABLE:
+            # selectolax needs the complete document
+            return parse_events(f.read())
+        
+        parser = OutlookEventParser()
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            parser.feed(chunk)
+        parser.close()
+        return parser.events
+
+
+def parse_calendar_file(file_path):
+    """Extract calendar events from an Outlook HTML or MHTML export.
+    
+    Tries MHTML first and falls back to plain HTML.
+    
+    Args:
+        file_path: Path to the HTML or MHTML file
+        
+    Returns:
+        List of event dictionaries
+    """
+    html_content = extract_html_from_mhtml(file_path)
+    if html_content:
+        print("Detected MHTML format, extracted HTML content")
+        print("Parsing events...")
+        return parse_events(html_content)
+    
+    # Not MHTML, parse as plain HTML straight from the file
+    print("Reading as HTML format")
+    print("Parsing events...")
+    return parse_html_file(file_path)
+
+
+def dedupe_events(events):
+    """Remove repeated events, keeping the first occurrence.
+    
+    An event is a duplicate when its summary, start and end all match an
+    earlier one (Outlook can render the same event more than once).
+    
+    Args:
+        events: List of event dictionaries
+        
+    Returns:
+        List of unique event dictionaries, in original order
+    """
+    seen = set()
+    unique = []
+    for event in events:
+        key = (event['summary'], event['start'], event['end'])
+        if key not in seen:
+            seen.add(key)
+            unique.append(event)
+    return unique
+
+
 class ICSGenerator:
     """Generate ICS file from event data."""
     
@@ -193,10 +397,15 @@ class ICSGenerator:
         self.ics_lines = []
         self.email_domain = email_domain
         self.timezone = timezone
+        # Creation time of this calendar, shared by all events (UTC)
+        self.dtstamp = _ics_fmt(datetime.now(dt_timezone.utc)) + "Z"
+        # ORGANIZER lines by organizer name; recurring events repeat organizers
+        self._organizer_lines = {}
         
-    def add_header(self):
-        """Add ICS file header."""
-        self.ics_lines.extend([
+    def add_header(self, out=None):
+        """Add ICS file header (to out if given, else to self.ics_lines)."""
+        lines = self.ics_lines if out is None else out
+        lines.extend([
             "BEGIN:VCALENDAR",
             "VERSION:2.0",
             "PRODID:-//Outlook Calendar to ICS Converter//EN",
@@ -206,29 +415,26 @@ class ICSGenerator:
             f"X-WR-TIMEZONE:{self.timezone}",
         ])
     
-    def add_event(self, event):
-        """Add an event to the ICS file."""
+    def add_event(self, event, out=None):
+        """Add an event to the ICS file (to out if given, else to self.ics_lines)."""
+        lines = self.ics_lines if out is None else out
+        
         # Format datetimes for ICS (YYYYMMDDTHHmmss)
-        start_dt = event["start"].strftime("%Y%m%dT%H%M%S")
-        end_dt = event["end"].strftime("%Y%m%dT%H%M%S")
-        now_dt = datetime.now().strftime("%Y%m%dT%H%M%SZ")
+        start_dt = _ics_fmt(event["start"])
+        end_dt = _ics_fmt(event["end"])
+        now_dt = self.dtstamp
         
-        # Generate a unique ID
-        uid = f"{start_dt}-{hash(event['summary'])}"
+        # Generate a unique ID (stable across runs so re-imports update instead of duplicating)
+        summary_hash = hashlib.blake2b(event['summary'].encode('utf-8'), digest_size=8).hexdigest()
+        uid = f"{start_dt}-{summary_hash}"
         
         # Map status to ICS status
-        status_map = {
-            "Tentative": "TENTATIVE",
-            "Busy": "CONFIRMED",
-            "Free": "CONFIRMED",
-            "Out of Office": "CONFIRMED"
-        }
-        ics_status = status_map.get(event["status"], "CONFIRMED")
+        ics_status = _ICS_STATUS_MAP.get(event["status"], "CONFIRMED")
         
         if event["is_canceled"]:
             ics_status = "CANCELLED"
         
-        self.ics_lines.extend([
+        lines.extend([
             "BEGIN:VEVENT",
             f"UID:{uid}",
             f"DTSTAMP:{now_dt}",
@@ -239,31 +445,36 @@ class ICSGenerator:
         ])
         
         if event["organizer"]:
-            # Create email from organizer name (simplified - just use first word as username)
-            organizer_name = event["organizer"].split()[0].lower() if event["organizer"] else "organizer"
-            self.ics_lines.append(f"ORGANIZER;CN={self.escape_text(event['organizer'])}:mailto:{organizer_name}@{self.email_domain}")
+            lines.append(self._organizer_line(event["organizer"]))
         
         if event["event_type"]:
-            self.ics_lines.append(f"DESCRIPTION:{self.escape_text(event['event_type'])}")
+            lines.append(f"DESCRIPTION:{self.escape_text(event['event_type'])}")
         
         # Add transparency based on status
         transp = "TRANSPARENT" if event["status"] == "Free" else "OPAQUE"
-        self.ics_lines.append(f"TRANSP:{transp}")
+        lines.append(f"TRANSP:{transp}")
         
-        self.ics_lines.append("END:VEVENT")
+        lines.append("END:VEVENT")
+    
+    def _organizer_line(self, organizer):
+        """Return the ORGANIZER property line for an organizer name (cached per name)."""
+        line = self._organizer_lines.get(organizer)
+        if line is None:
+            # Create email from organizer name (simplified - just use first word as username)
+            organizer_name = organizer.split()[0].lower()
+            line = f"ORGANIZER;CN={self.escape_text(organizer)}:mailto:{organizer_name}@{self.email_domain}"
+            self._organizer_lines[organizer] = line
+        return line
     
-    def add_footer(self):
-        """Add ICS file footer."""
-        self.ics_lines.append("END:VCALENDAR")
+    def add_footer(self, out=None):
+        """Add ICS file footer (to out if given, else to self.ics_lines)."""
+        lines = self.ics_lines if out is None else out
+        lines.append("END:VCALENDAR")
     
     def escape_text(self, text):
         """Escape special characters in ICS text fields."""
-        # Escape special characters according to RFC 5545
-        text = text.replace("\\", "\\\\")
-        text = text.replace(";", "\\;")
-        text = text.replace(",", "\\,")
-        text = text.replace("\n", "\\n")
-        return text
+        # Escape special characters according to RFC 5545 (single pass)
+        return text.translate(_ICS_ESCAPE)
     
     def generate(self, events):
         """Generate complete ICS file content."""
@@ -274,16 +485,48 @@ class ICSGenerator:
         
         self.add_footer()
         
-        return "\n".join(self.ics_lines)
+        # RFC 5545 requires CRLF line endings
+        return "\r\n".join(self.ics_lines)
+    
+    def iter_lines(self, events):
+        """Yield complete ICS content as UTF-8 encoded, CRLF-terminated lines.
+        
+        Suitable for binary_file.writelines(); only one event's lines are
+        held in memory at a time.
+        
+        Args:
+            events: List of event dictionaries
+        """
+        lines = []
+        self.add_header(lines)
+        
+        for event in events:
+            self.add_event(event, lines)
+            for line in lines:
+                yield line.encode('utf-8') + b"\r\n"
+            lines.clear()
+        
+        self.add_footer(lines)
+        for line in lines:
+            yield line.encode('utf-8') + b"\r\n"
 
 
 class GoogleCalendarExporter:
     """Export events directly to Google Calendar."""
     
-    # If modifying these scopes, delete the file token.pickle.
+    # If modifying these scopes, delete the file token.json.
     SCOPES = ['https://www.googleapis.com/auth/calendar']
     
-    def __init__(self, credentials_file='credentials.json', token_file='token.pickle', use_service_account=False):
+    # Maximum number of requests per batch HTTP call (API limit is 1000, Google recommends 50)
+    BATCH_SIZE = 50
+    
+    # Number of batch requests sent concurrently (kept low to stay within per-user rate limits)
+    MAX_WORKERS = 4
+    
+    # Times a rate-limited write is re-sent, waiting 1s, 2s, 4s, ... in between
+    MAX_RETRIES = 5
+    
+    def __init__(self, credentials_file='credentials.json', token_file='token.json', use_service_account=False):
         """Initialize Google Calendar exporter.
         
         Args:
@@ -295,6 +538,12 @@ class GoogleCalendarExporter:
         self.token_file = token_file
         self.use_service_account = use_service_account
         self.service = None
+        self.credentials = None
+        # Teams meeting link added to every exported event (if configured)
+        self.teams_link = os.getenv('TEAMS_MEETING_LINK', '')
+        # (summary, "YYYY-MM-DDTHH:MM") -> list of existing Google events,
+        # populated by load_existing_events()
+        self._existing_index = None
         
     def authenticate(self):
         """Authenticate with Google Calendar API."""
@@ -319,13 +568,13 @@ class GoogleCalendarExporter:
             # Use OAuth2 authentication (interactive)
             creds = self._authenticate_oauth()
         
+        self.credentials = creds
         self.service = build('calendar', 'v3', credentials=creds)
         return True
     
     def _is_service_account_file(self):
         """Check if credentials file is a service account key."""
         try:
-            import json
             with open(self.credentials_file, 'r') as f:
                 data = json.load(f)
                 return data.get('type') == 'service_account'
@@ -347,10 +596,14 @@ class GoogleCalendarExporter:
         """Authenticate using OAuth2 (interactive browser flow)."""
         creds = None
         
-        # The file token.pickle stores the user's access and refresh tokens
+        # The file token.json stores the user's access and refresh tokens
         if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
+            try:
+                with open(self.token_file, 'r') as token:
+                    creds = Credentials.from_authorized_user_info(json.load(token), self.SCOPES)
+            except ValueError:
+                # Unreadable or incomplete token file, log in again
+                creds = None
         
         # If there are no (valid) credentials available, let the user log in
         if not creds or not creds.valid:
@@ -363,8 +616,8 @@ class GoogleCalendarExporter:
                 creds = flow.run_local_server(port=0)
             
             # Save the credentials for the next run
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(self.token_file, 'w') as token:
+                token.write(creds.to_json())
         
         return creds
     
@@ -396,17 +649,87 @@ class GoogleCalendarExporter:
             print(f"An error occurred: {error}")
             return None
     
-    def _find_existing_event(self, event_data, calendar_id, timezone):
+    def load_existing_events(self, events, calendar_id):
+        """Fetch existing calendar events for the whole export range at once.
+        
+        Builds an index keyed by title and start time so duplicate detection
+        is a dictionary lookup instead of one API request per event.
+        
+        Args:
+            events: List of event dictionaries that are about to be exported
+            calendar_id: Google Calendar ID
+        """
+        self._existing_index = {}
+        if not events:
+            return
+        
+        # Same margin as the per-event search (1 day before, 2 days after),
+        # applied once to the full range of events
+        search_start = min(event['start'] for event in events) - timedelta(days=1)
+        search_end = max(event['start'] for event in events) + timedelta(days=2)
+        
+        try:
+            page_token = None
+            while True:
+                events_result = self.service.events().list(
+                    calendarId=calendar_id,
+                    timeMin=search_start.isoformat() + 'Z',
+                    timeMax=search_end.isoformat() + 'Z',
+                    singleEvents=True,
+                    orderBy='startTime',
+                    showDeleted=True,  # Include cancelled events
+                    maxResults=2500,
+                    pageToken=page_token
+                ).execute()
+                
+                for event in events_result.get('items', []):
+                    self._index_existing_event(event)
+                
+                page_token = events_result.get('nextPageToken')
+                if not page_token:
+                    break
+        except HttpError as error:
+            # Fall back to searching per event
+            print(f"Warning: Could not load existing events: {error}", file=sys.stderr)
+            self._existing_index = None
+    
+    def _index_existing_event(self, event):
+        """Add a Google Calendar event to the existing-event index."""
+        existing_start_str = event.get('start', {}).get('dateTime', '')
+        if not existing_start_str:
+            return
+        # Key on date and time only (YYYY-MM-DDTHH:MM), ignoring the timezone offset
+        key = (event.get('summary'), existing_start_str[:16])
+        self._existing_index.setdefault(key, []).append(event)
+    
+    def _find_existing_event(self, event_data, calendar_id, timezone, new_start=None):
         """Find existing event in calendar that matches this event.
         
+        Uses the index from load_existing_events() when available, otherwise
+        searches the calendar around the event's start time.
+        
         Args:
             event_data: Event data dictionary
             calendar_id: Google Calendar ID
             timezone: IANA timezone string
+            new_start: Event start formatted as 'YYYY-MM-DDTHH:MM' (computed if omitted)
             
         Returns:
             Existing event dict if found, None otherwise
         """
+        if new_start is None:
+            new_start = event_data['start'].strftime('%Y-%m-%dT%H:%M')
+        
+        if self._existing_index is not None:
+            key = (event_data['summary'], new_start)
+            looking_for_cancelled = event_data.get('is_canceled', False)
+            for event in self._existing_index.get(key, ()):
+                # Cancelled events are deleted instances of recurring events that can't be updated
+                if event.get('status') == 'cancelled' and not looking_for_cancelled:
+                    continue
+                return event
+            return None
+        
         try:
             # Search for events around the target time
             # Use a broader window to account for timezone differences
@@ -461,9 +784,8 @@ class GoogleCalendarExporter:
                 try:
                     # Extract just the date and time part (YYYY-MM-DDTHH:MM)
                     existing_start_prefix = existing_start_str[:16]  # "2025-09-29T10:30"
-                    new_start_prefix = event_data['start'].strftime('%Y-%m-%dT%H:%M')
                     
-                    if existing_start_prefix == new_start_prefix:
+                    if existing_start_prefix == new_start:
                         return event
                 except:
                     continue
@@ -474,18 +796,25 @@ class GoogleCalendarExporter:
             # If search fails, return None to create new event
             return None
     
-    def _events_are_different(self, existing_event, new_event_data, event_data, timezone):
+    def _events_are_different(self, existing_event, new_event_data, new_start, new_end):
         """Compare existing event with new event data to detect changes.
         
         Args:
             existing_event: Existing Google Calendar event
             new_event_data: New event data in Google Calendar format
-            event_data: Original event data dictionary
-            timezone: IANA timezone string
+            new_start: New start time formatted as 'YYYY-MM-DDTHH:MM'
+            new_end: New end time formatted as 'YYYY-MM-DDTHH:MM'
             
         Returns:
             True if events are different, False if identical
         """
+        # Events exported by this script carry a hash of their content;
+        # compare that and only fall back to field-by-field for older events
+        existing_hash = existing_event.get('extendedProperties', {}).get('private', {}).get('src_hash')
+        if existing_hash:
+            new_hash = new_event_data.get('extendedProperties', {}).get('private', {}).get('src_hash')
+            return existing_hash != new_hash
+        
         # Compare summary (required field)
         if existing_event.get('summary', '') != new_event_data.get('summary', ''):
             return True
@@ -493,12 +822,10 @@ class GoogleCalendarExporter:
         # Compare start/end times (only date and time, ignore timezone offset)
         # Format: "2025-09-29T10:30" (first 16 chars)
         existing_start = existing_event.get('start', {}).get('dateTime', '')[:16]
-        new_start = event_data['start'].strftime('%Y-%m-%dT%H:%M')
         if existing_start != new_start:
             return True
         
         existing_end = existing_event.get('end', {}).get('dateTime', '')[:16]
-        new_end = event_data['end'].strftime('%Y-%m-%dT%H:%M')
         if existing_end != new_end:
             return True
         
@@ -523,122 +850,292 @@ class GoogleCalendarExporter:
         # No differences found
         return False
     
-    def export_event(self, event_data, calendar_id='primary', timezone='America/Los_Angeles', verbose=False):
-        """Export a single event to Google Calendar (create or update if changed).
+    def _build_google_event(self, event_data, timezone):
+        """Convert event data to a Google Calendar event body.
         
         Args:
             event_data: Event data dictionary
-            calendar_id: Google Calendar ID
-            timezone: IANA timezone string (e.g., 'America/New_York', 'America/Los_Angeles')
-            verbose: If True, print debug information
+            timezone: IANA timezone string
             
         Returns:
-            Tuple of (action, link) where action is 'created', 'updated', or 'skipped'
+            Event body dictionary in Google Calendar format
         """
-        try:
-            # Convert event data to Google Calendar format
-            google_event = {
-                'summary': event_data['summary'],
-                'start': {
-                    'dateTime': event_data['start'].isoformat(),
-                    'timeZone': timezone,
-                },
-                'end': {
-                    'dateTime': event_data['end'].isoformat(),
-                    'timeZone': timezone,
-                },
-            }
-            
-            # Add organizer and Teams meeting link
-            teams_link = os.getenv('TEAMS_MEETING_LINK', '')
-            
-            if event_data.get('organizer'):
-                google_event['description'] = f"Organizer: {event_data['organizer']}"
-                if event_data.get('event_type'):
-                    google_event['description'] += f"\nType: {event_data['event_type']}"
+        google_event = {
+            'summary': event_data['summary'],
+            'start': {
+                'dateTime': event_data['start'].isoformat(),
+                'timeZone': timezone,
+            },
+            'end': {
+                'dateTime': event_data['end'].isoformat(),
+                'timeZone': timezone,
+            },
+        }
+        
+        # Add organizer and Teams meeting link
+        teams_link = self.teams_link
+        
+        if event_data.get('organizer'):
+            google_event['description'] = f"Organizer: {event_data['organizer']}"
+            if event_data.get('event_type'):
+                google_event['description'] += f"\nType: {event_data['event_type']}"
+        else:
+            google_event['description'] = ""
+        
+        # Add Teams meeting link to description and location (if configured)
+        if teams_link:
+            if google_event['description']:
+                google_event['description'] += f"\n\nMicrosoft Teams Meeting:\n{teams_link}"
             else:
-                google_event['description'] = ""
-            
-            # Add Teams meeting link to description and location (if configured)
-            if teams_link:
-                if google_event['description']:
-                    google_event['description'] += f"\n\nMicrosoft Teams Meeting:\n{teams_link}"
-                else:
-                    google_event['description'] = f"Microsoft Teams Meeting:\n{teams_link}"
-                
-                google_event['location'] = "Microsoft Teams Meeting"
-            
-            # Add status
-            status_map = {
-                'Tentative': 'tentative',
-                'Busy': 'confirmed',
-                'Free': 'confirmed',
-                'Out of Office': 'confirmed'
-            }
-            google_event['status'] = status_map.get(event_data['status'], 'confirmed')
+                google_event['description'] = f"Microsoft Teams Meeting:\n{teams_link}"
             
-            if event_data['is_canceled']:
-                google_event['status'] = 'cancelled'
+            google_event['location'] = "Microsoft Teams Meeting"
+        
+        # Add status
+        google_event['status'] = _GCAL_STATUS_MAP.get(event_data['status'], 'confirmed')
+        
+        if event_data['is_canceled']:
+            google_event['status'] = 'cancelled'
+        
+        # Add transparency
+        google_event['transparency'] = 'transparent' if event_data['status'] == 'Free' else 'opaque'
+        
+        # Store a hash of the exported content so later runs can detect
+        # unchanged events without comparing every field
+        google_event['extendedProperties'] = {
+            'private': {'src_hash': self._content_hash(google_event)}
+        }
+        
+        return google_event
+    
+    @staticmethod
+    def _content_hash(google_event):
+        """Return a short, stable hash of the fields we export for an event."""
+        canonical = repr((
+            google_event['summary'],
+            google_event['start']['dateTime'],
+            google_event['start']['timeZone'],
+            google_event['end']['dateTime'],
+            google_event['end']['timeZone'],
+            google_event.get('description', ''),
+            google_event.get('location', ''),
+            google_event['status'],
+            google_event['transparency'],
+        ))
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+    
+    def _print_changes(self, existing_event, google_event, new_start, new_end):
+        """Print which fields differ between an existing and a new event (verbose mode)."""
+        if existing_event.get('summary', '') != google_event.get('summary', ''):
+            print(f"       Changed: title")
+        if existing_event.get('start', {}).get('dateTime', '')[:16] != new_start:
+            print(f"       Changed: start time")
+        if existing_event.get('end', {}).get('dateTime', '')[:16] != new_end:
+            print(f"       Changed: end time")
+        if (existing_event.get('description') or '').strip() != (google_event.get('description') or '').strip():
+            print(f"       Changed: description")
+            print(f"         Old: {(existing_event.get('description') or '')[:50]}")
+            print(f"         New: {(google_event.get('description') or '')[:50]}")
+        if (existing_event.get('status') or 'confirmed').lower() != (google_event.get('status') or 'confirmed').lower():
+            print(f"       Changed: status")
+            print(f"         Old: {existing_event.get('status') or 'confirmed'}")
+            print(f"         New: {google_event.get('status') or 'confirmed'}")
+        if (existing_event.get('transparency') or 'opaque').lower() != (google_event.get('transparency') or 'opaque').lower():
+            print(f"       Changed: transparency")
+    
+    def export_events_batch(self, events, calendar_id='primary', timezone='America/Los_Angeles', verbose=False):
+        """Export events to Google Calendar using batched API requests.
+        
+        Events are first classified against the existing-event index, so only
+        real inserts and updates are sent, up to BATCH_SIZE per HTTP request.
+        
+        Args:
+            events: List of event dictionaries
+            calendar_id: Google Calendar ID
+            timezone: IANA timezone string
+            verbose: If True, print debug information
             
-            # Add transparency
-            google_event['transparency'] = 'transparent' if event_data['status'] == 'Free' else 'opaque'
+        Returns:
+            Dict of counts keyed by action ('created', 'updated', 'skipped', 'error')
+        """
+        # Always index the range of these events; an index left over from an
+        # earlier call may cover a different date range
+        self.load_existing_events(events, calendar_id)
+        
+        counts = {'created': 0, 'updated': 0, 'skipped': 0, 'error': 0}
+        
+        # Classify events, collecting (action, request) pairs for the writes
+        writes = []
+        queued_keys = set()
+        for event_data in events:
+            google_event = self._build_google_event(event_data, timezone)
+            new_start = event_data['start'].strftime('%Y-%m-%dT%H:%M')
+            new_end = event_data['end'].strftime('%Y-%m-%dT%H:%M')
             
-            # Check if event already exists
             if verbose:
                 print(f"\n  Checking: {event_data['summary'][:50]}... @ {event_data['start'].strftime('%Y-%m-%d %H:%M')}")
             
-            existing_event = self._find_existing_event(event_data, calendar_id, timezone)
+            # An identical event earlier in this run is already queued for writing
+            key = (event_data['summary'], new_start)
+            if key in queued_keys:
+                if verbose:
+                    print(f"    → Duplicate of an event already queued, skipping")
+                counts['skipped'] += 1
+                continue
+            
+            existing_event = self._find_existing_event(event_data, calendar_id, timezone, new_start)
             
             if existing_event:
                 if verbose:
                     print(f"    Found existing event (ID: {existing_event['id'][:20]}...)")
                 
-                # Event exists, check if it's different
-                is_different = self._events_are_different(existing_event, google_event, event_data, timezone)
-                
-                if is_different:
-                    if verbose:
-                        print(f"    → Event changed, updating...")
-                        # Show what changed
-                        if existing_event.get('summary', '') != google_event.get('summary', ''):
-                            print(f"       Changed: title")
-                        if existing_event.get('start', {}).get('dateTime', '')[:16] != event_data['start'].strftime('%Y-%m-%dT%H:%M'):
-                            print(f"       Changed: start time")
-                        if existing_event.get('end', {}).get('dateTime', '')[:16] != event_data['end'].strftime('%Y-%m-%dT%H:%M'):
-                            print(f"       Changed: end time")
-                        if (existing_event.get('description') or '').strip() != (google_event.get('description') or '').strip():
-                            print(f"       Changed: description")
-                            print(f"         Old: {(existing_event.get('description') or '')[:50]}")
-                            print(f"         New: {(google_event.get('description') or '')[:50]}")
-                        if (existing_event.get('status') or 'confirmed').lower() != (google_event.get('status') or 'confirmed').lower():
-                            print(f"       Changed: status")
-                            print(f"         Old: {existing_event.get('status') or 'confirmed'}")
-                            print(f"         New: {google_event.get('status') or 'confirmed'}")
-                        if (existing_event.get('transparency') or 'opaque').lower() != (google_event.get('transparency') or 'opaque').lower():
-                            print(f"       Changed: transparency")
-                    
-                    # Update the existing event
-                    updated_event = self.service.events().update(
-                        calendarId=calendar_id,
-                        eventId=existing_event['id'],
-                        body=google_event
-                    ).execute()
-                    return ('updated', updated_event.get('htmlLink'))
-                else:
+                if not self._events_are_different(existing_event, google_event, new_start, new_end):
                     if verbose:
                         print(f"    → Event unchanged, skipping")
-                    # Event is identical, skip
-                    return ('skipped', existing_event.get('htmlLink'))
+                    counts['skipped'] += 1
+                    continue
+                
+                if verbose:
+                    print(f"    → Event changed, updating...")
+                    self._print_changes(existing_event, google_event, new_start, new_end)
+                request = self.service.events().update(
+                    calendarId=calendar_id,
+                    eventId=existing_event['id'],
+                    body=google_event
+                )
+                writes.append(('updated', request))
             else:
                 if verbose:
                     print(f"    → No existing event found, creating new...")
-                # Event doesn't exist, create it
-                event = self.service.events().insert(calendarId=calendar_id, body=google_event).execute()
-                return ('created', event.get('htmlLink'))
+                request = self.service.events().insert(calendarId=calendar_id, body=google_event)
+                writes.append(('created', request))
             
-        except HttpError as error:
-            print(f"An error occurred: {error}", file=sys.stderr)
-            return ('error', None)
+            queued_keys.add(key)
+        
+        writes_by_id = {str(index): write for index, write in enumerate(writes)}
+        # Batch callbacks run on worker threads
+        lock = threading.Lock()
+        
+        def on_response(retry, request_id, response, exception):
+            with lock:
+                if exception is not None:
+                    if isinstance(exception, HttpError) and self._is_rate_limited(exception):
+                        retry.append(request_id)
+                        return
+                    print(f"An error occurred: {exception}", file=sys.stderr)
+                    counts['error'] += 1
+                    return
+                action = writes_by_id[request_id][0]
+                counts[action] += 1
+                if action == 'created' and self._existing_index is not None:
+                    self._index_existing_event(response)
+        
+        # httplib2.Http objects aren't thread-safe, so each worker thread
+        # sends its batches over its own connection
+        thread_state = threading.local()
+        
+        progress = None
+        if writes and not verbose:
+            batch_count = (len(writes) + self.BATCH_SIZE - 1) // self.BATCH_SIZE
+            print(f"  Sending {len(writes)} changes in {batch_count} batch(es) ({counts['skipped']} events unchanged)...")
+            if TQDM_AVAILABLE:
+                progress = tqdm(total=len(writes), desc="  Exporting", unit="event")
+        sent = [0]
+        
+        def report(done):
+            with lock:
+                sent[0] += done
+                if progress is not None:
+                    progress.set_postfix(created=counts['created'], updated=counts['updated'], refresh=False)
+                    progress.update(done)
+                elif not verbose:
+                    print(f"  Processed {sent[0]}/{len(writes)} changes... (created: {counts['created']}, updated: {counts['updated']})")
+        
+        def execute_batch(request_ids):
+            """Send one batch and return the IDs of rate-limited requests."""
+            if not hasattr(thread_state, 'http'):
+                thread_state.http = self._new_http()
+            retry = []
+            batch = self.service.new_batch_http_request(callback=functools.partial(on_response, retry))
+            for request_id in request_ids:
+                batch.add(writes_by_id[request_id][1], request_id=request_id)
+            try:
+                batch.execute(http=thread_state.http)
+            except HttpError as error:
+                if self._is_rate_limited(error):
+                    # The whole batch was rejected, so all of it is retried
+                    retry = list(request_ids)
+                else:
+                    with lock:
+                        print(f"An error occurred: {error}", file=sys.stderr)
+                        counts['error'] += len(request_ids)
+            report(len(request_ids) - len(retry))
+            return retry
+        
+        pending = list(writes_by_id)
+        try:
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                for attempt in range(self.MAX_RETRIES + 1):
+                    if attempt:
+                        # Exponential backoff before re-sending rate-limited writes
+                        delay = 2 ** (attempt - 1)
+                        message = f"  Rate limited on {len(pending)} changes, retrying in {delay}s..."
+                        if progress is not None:
+                            progress.write(message)
+                        else:
+                            print(message)
+                        time.sleep(delay)
+                    chunks = [pending[start:start + self.BATCH_SIZE]
+                              for start in range(0, len(pending), self.BATCH_SIZE)]
+                    # Consuming the results re-raises any unexpected exception from a worker
+                    pending = [request_id
+                               for retry in executor.map(execute_batch, chunks)
+                               for request_id in retry]
+                    if not pending:
+                        break
+            
+            if pending:
+                print(f"An error occurred: {len(pending)} changes still rate limited after "
+                      f"{self.MAX_RETRIES} retries", file=sys.stderr)
+                counts['error'] += len(pending)
+                report(len(pending))
+        finally:
+            if progress is not None:
+                progress.close()
+        
+        return counts
+    
+    @staticmethod
+    def _is_rate_limited(error):
+        """Check whether an HttpError is a rate-limit rejection worth retrying.
+        
+        Args:
+            error: HttpError from a request or batch
+            
+        Returns:
+            True for 429 responses and 403 rateLimitExceeded/userRateLimitExceeded
+        """
+        status = getattr(error.resp, 'status', None)
+        if status == 429:
+            return True
+        if status != 403:
+            return False
+        content = error.content
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='replace')
+        return 'rateLimitExceeded' in content or 'userRateLimitExceeded' in content
+    
+    def _new_http(self):
+        """Create a new authorized HTTP object for use on a worker thread.
+        
+        Returns None when no credentials are loaded, in which case requests
+        use the service's default HTTP object.
+        """
+        if self.credentials is None:
+            return None
+        # build_http() applies the client library's default socket timeout,
+        # like the service's own HTTP object
+        return google_auth_httplib2.AuthorizedHttp(self.credentials, http=build_http())
     
     def export_events(self, events, calendar_name='Outlook Calendar Import', timezone='America/Los_Angeles'):
         """Export all events to Google Calendar.
@@ -658,14 +1155,8 @@ class GoogleCalendarExporter:
             return False
         
         print(f"\nExporting {len(events)} events to Google Calendar (timezone: {timezone})...")
-        success_count = 0
-        
-        for i, event in enumerate(events):
-            link = self.export_event(event, calendar_id, timezone)
-            if link:
-                success_count += 1
-                if (i + 1) % 10 == 0:
-                    print(f"  Exported {i + 1}/{len(events)} events...")
+        counts = self.export_events_batch(events, calendar_id, timezone)
+        success_count = counts['created'] + counts['updated'] + counts['skipped']
         
         print(f"\n✓ Successfully exported {success_count}/{len(events)} events to Google Calendar!")
         print(f"  View your calendar at: https://calendar.google.com")
@@ -704,19 +1195,19 @@ Examples:
     parser.add_argument(
         'input_file',
         nargs='?',
-        default=os.getenv('OUTLOOK_INPUT_FILE', 'calendar.mhtml'),
+        default=_DEFAULT_INPUT_FILE,
         help='Input HTML or MHTML file from Outlook calendar (default: from .env OUTLOOK_INPUT_FILE or calendar.mhtml)'
     )
     
     parser.add_argument(
         '-o', '--output',
-        default=os.getenv('OUTLOOK_OUTPUT_FILE', 'outlook_calendar.ics'),
+        default=_DEFAULT_OUTPUT_FILE,
         help='Output ICS file path (default: from .env OUTLOOK_OUTPUT_FILE or outlook_calendar.ics)'
     )
     
     parser.add_argument(
         '-d', '--domain',
-        default=os.getenv('OUTLOOK_EMAIL_DOMAIN', 'domain.com'),
+        default=_DEFAULT_EMAIL_DOMAIN,
         help='Email domain for organizer addresses (default: from .env OUTLOOK_EMAIL_DOMAIN or domain.com)'
     )
     
@@ -728,32 +1219,32 @@ Examples:
     
     parser.add_argument(
         '-c', '--calendar-name',
-        default=os.getenv('GOOGLE_CALENDAR_NAME'),
+        default=_DEFAULT_CALENDAR_NAME,
         help='Name for a new/separate Google Calendar (default: from .env GOOGLE_CALENDAR_NAME or uses your primary calendar)'
     )
     
     parser.add_argument(
         '--credentials',
-        default=os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json'),
+        default=_DEFAULT_CREDENTIALS_FILE,
         help='Path to Google Calendar API credentials file (default: from .env GOOGLE_CREDENTIALS_FILE or credentials.json)'
     )
     
     parser.add_argument(
         '--service-account',
         action='store_true',
-        default=os.getenv('GOOGLE_USE_SERVICE_ACCOUNT', '').lower() in ('true', '1', 'yes'),
+        default=_DEFAULT_USE_SERVICE_ACCOUNT,
         help='Use service account authentication (static key) instead of OAuth2 (default: from .env GOOGLE_USE_SERVICE_ACCOUNT)'
     )
     
     parser.add_argument(
         '--calendar-id',
-        default=os.getenv('GOOGLE_CALENDAR_ID'),
+        default=_DEFAULT_CALENDAR_ID,
         help='Calendar ID to use (for service accounts, use email address of shared calendar) (default: from .env GOOGLE_CALENDAR_ID)'
     )
     
     parser.add_argument(
         '-tz', '--timezone',
-        default=os.getenv('OUTLOOK_TIMEZONE', 'America/Los_Angeles'),
+        default=_DEFAULT_TIMEZONE,
         help='IANA timezone for events (default: from .env OUTLOOK_TIMEZONE or America/Los_Angeles). Common: America/New_York (ET), America/Chicago (CT), America/Denver (MT)'
     )
     
@@ -776,34 +1267,19 @@ Examples:
     
     print(f"Reading calendar data from: {input_file}")
     
-    # Try to read as MHTML first, then fall back to HTML
-    html_content = None
     try:
-        # First, try to parse as MHTML
-        html_content = extract_html_from_mhtml(input_file)
-        if html_content:
-            print("Detected MHTML format, extracted HTML content")
-        else:
-            # Not MHTML, read as plain HTML
-            with open(input_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            print("Reading as HTML format")
+        events = parse_calendar_file(input_file)
     except Exception as e:
         print(f"Error reading file: {e}", file=sys.stderr)
         sys.exit(1)
     
-    if not html_content:
-        print("Error: Could not extract HTML content from file", file=sys.stderr)
-        sys.exit(1)
-    
-    # Parse events
-    print("Parsing events...")
-    parser = OutlookEventParser()
-    parser.feed(html_content)
-    
-    events = parser.events
     print(f"Found {len(events)} events")
     
+    unique_events = dedupe_events(events)
+    if len(unique_events) < len(events):
+        print(f"Skipping {len(events) - len(unique_events)} duplicate events")
+        events = unique_events
+    
     if not events:
         print("Warning: No events found in the HTML file.", file=sys.stderr)
         sys.exit(1)
@@ -857,29 +1333,15 @@ Examples:
                 print("Using your default Google Calendar")
             
             # Export events to the selected calendar
-            created_count = 0
-            updated_count = 0
-            skipped_count = 0
-            error_count = 0
-            
             print(f"\nExporting {len(events)} events to Google Calendar (timezone: {args.timezone})...")
             print("  Checking for duplicates and changes...")
             
-            for i, event in enumerate(events):
-                action, link = exporter.export_event(event, calendar_id, timezone=args.timezone, verbose=args.verbose)
-                
-                if action == 'created':
-                    created_count += 1
-                elif action == 'updated':
-                    updated_count += 1
-                elif action == 'skipped':
-                    skipped_count += 1
-                elif action == 'error':
-                    error_count += 1
-                
-                # Show progress every 10 events (skip if verbose mode is on)
-                if not args.verbose and (i + 1) % 10 == 0:
-                    print(f"  Processed {i + 1}/{len(events)} events... (created: {created_count}, updated: {updated_count}, skipped: {skipped_count})")
+            # Inserts and updates are sent in batches of up to 50 per request
+            counts = exporter.export_events_batch(events, calendar_id, timezone=args.timezone, verbose=args.verbose)
+            created_count = counts['created']
+            updated_count = counts['updated']
+            skipped_count = counts['skipped']
+            error_count = counts['error']
             
             success = (created_count + updated_count + skipped_count) > 0
             
@@ -917,12 +1379,11 @@ Examples:
         # Generate ICS file
         print(f"\nGenerating ICS file with domain: {email_domain}, timezone: {args.timezone}")
         generator = ICSGenerator(email_domain, args.timezone)
-        ics_content = generator.generate(events)
         
         # Write ICS file
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(ics_content)
+            with open(output_file, 'wb', buffering=1 << 20) as f:
+                f.writelines(generator.iter_lines(events))
             print(f"\nSuccess! ICS file created: {output_file}")
             print(f"Total events exported: {len(events)}")
             print(f"\nYou can now import '{output_file}' into macOS Calendar:")